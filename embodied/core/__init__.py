@@ -13,6 +13,7 @@ from .driver import Driver
 from .flags import Flags
 from .logger import Logger
 from .parallel import Parallel
+from .parallel_group import ParallelGroup
 from .timer import Timer
 from .worker import Worker
 from .batcher import Batcher
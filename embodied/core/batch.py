@@ -1,3 +1,5 @@
+import functools
+
 import numpy as np
 
 from . import base
@@ -11,11 +13,12 @@ class BatchEnv(base.Env):
         self._parallel = parallel
         self._keys = list(self.obs_space.keys())
 
-    @property
+    @functools.cached_property
     def obs_space(self):
+        # Cached since reading through a Parallel env costs a round trip.
         return self._envs[0].obs_space
 
-    @property
+    @functools.cached_property
     def act_space(self):
         return self._envs[0].act_space
 
@@ -1,20 +1,28 @@
+import atexit
 import collections
 import concurrent.futures
+import contextlib
 import datetime
 import json
+import math
 import os
+import queue
 import re
+import threading
 import time
 
 import numpy as np
 import rich.console
-import wandb
 from subprocess import Popen, PIPE
-import torch
 
 from . import path
 from . import basics
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class Logger:
     def __init__(self, step, outputs, multiplier=1):
@@ -24,11 +32,29 @@ class Logger:
         self.multiplier = multiplier
         self._last_step = None
         self._last_time = None
-        self._metrics = []
+        # Pending metrics grouped by step, since all names in one add() call
+        # share the same step.
+        self._metrics = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # Writes pending metrics and closes outputs that hold files open.
+        self.write()
+        for output in self.outputs:
+            if hasattr(output, "close"):
+                output.close()
 
     def add(self, mapping, prefix=None):
         step = int(self.step) * self.multiplier
-        for name, value in dict(mapping).items():
+        metrics = self._metrics.setdefault(step, {})
+        # Dicts are only read here, so they need no defensive copy.
+        mapping = mapping if isinstance(mapping, dict) else dict(mapping)
+        for name, value in mapping.items():
             name = f"{prefix}/{name}" if prefix else name
             value = basics.convert(value)
             if len(value.shape) not in (0, 1, 2, 3, 4):
@@ -36,7 +62,7 @@ class Logger:
                     f"Shape {value.shape} for name '{name}' cannot be "
                     "interpreted as scalar, histogram, image, or video."
                 )
-            self._metrics.append((step, name, value))
+            metrics[name] = value
 
     def scalar(self, name, value):
         self.add({name: value})
@@ -52,11 +78,16 @@ class Logger:
             value = self._compute_fps()
             if value is not None:
                 self.scalar("fps", value)
-        if not self._metrics:
+        summaries = tuple(
+            (step, name, value)
+            for step, metrics in self._metrics.items()
+            for name, value in metrics.items()
+        )
+        self._metrics.clear()
+        if not summaries:
             return
         for output in self.outputs:
-            output(tuple(self._metrics))
-        self._metrics.clear()
+            output(summaries)
 
     def _compute_fps(self):
         step = int(self.step) * self.multiplier
@@ -72,20 +103,66 @@ class Logger:
 
 
 class AsyncOutput:
-    def __init__(self, callback, parallel=True):
+    """Runs the callback on a writer thread when parallel is set.
+
+    Summaries are handed over through a queue, so the caller only blocks once
+    maxsize writes are waiting. If idle is given, the writer calls it whenever
+    no summaries arrived for idle_interval seconds. Errors of the callback are
+    raised from the next call or from wait().
+    """
+
+    def __init__(
+        self, callback, parallel=True, maxsize=1, idle=None, idle_interval=1.0
+    ):
         self._callback = callback
         self._parallel = parallel
         if parallel:
-            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-            self._future = None
+            self._queue = queue.Queue(maxsize)
+            self._idle = idle
+            self._idle_interval = idle_interval
+            self._error = None
+            self._thread = None
+            atexit.register(self.wait)
 
     def __call__(self, summaries):
         if self._parallel:
-            self._future and self._future.result()
-            self._future = self._executor.submit(self._callback, summaries)
+            self._raise()
+            if not self._thread:
+                self._thread = threading.Thread(target=self._loop, daemon=True)
+                self._thread.start()
+            self._queue.put(summaries)
         else:
             self._callback(summaries)
 
+    def wait(self):
+        if self._parallel:
+            self._queue.join()
+            self._raise()
+
+    def _raise(self):
+        if self._error:
+            error, self._error = self._error, None
+            raise error
+
+    def _loop(self):
+        timeout = self._idle and self._idle_interval
+        while True:
+            try:
+                summaries = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._run(self._idle)
+                continue
+            self._run(self._callback, summaries)
+            self._queue.task_done()
+
+    def _run(self, fn, *args):
+        # The writer keeps consuming after an error so that callers never
+        # block on a full queue, and the first error is kept for the caller.
+        try:
+            fn(*args)
+        except Exception as e:
+            self._error = self._error or e
+
 
 class TerminalOutput:
     def __init__(self, pattern=r".*", name=None):
@@ -137,28 +214,160 @@ class TerminalOutput:
 
 
 class JSONLOutput(AsyncOutput):
-    def __init__(self, logdir, filename="metrics.jsonl", pattern=r".*", parallel=True):
-        super().__init__(self._write, parallel)
+    def __init__(
+        self,
+        logdir,
+        filename="metrics.jsonl",
+        pattern=r".*",
+        parallel=True,
+        flush_interval=1.0,
+        buffer_size=1 << 16,
+        fsync_interval=None,
+        fsync_bytes=1 << 20,
+        maxsize=1,
+    ):
+        super().__init__(
+            self._write, parallel, maxsize, self._idle_flush, flush_interval
+        )
         self._filename = filename
         self._pattern = re.compile(pattern)
         self._logdir = path.Path(logdir)
         self._logdir.mkdirs()
+        # Encoded rows are collected and written together by the first write
+        # that finds more than buffer_size bytes pending or flush_interval
+        # seconds since the last flush. With parallel set, the writer thread
+        # also flushes once it has been idle for flush_interval seconds.
+        # Otherwise rows stay in memory until the next write or close().
+        self._flush_interval = flush_interval
+        self._buffer_size = buffer_size
+        self._chunks = []
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        # Syncing to disk is opt-in. When fsync_interval is set, flushed rows
+        # are synced at most once per fsync_interval seconds unless more than
+        # fsync_bytes are pending, so that many writes share one fsync.
+        self._fsync_interval = fsync_interval
+        self._fsync_bytes = fsync_bytes
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._files = contextlib.ExitStack()
+        self._fd = None
+        self._file = None
+        # Guards the file against idle flushes of the writer thread.
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            with self._lock:
+                self._flush()
+                self._fsync()
+                self._files.close()
+                self._fd = None
+                self._file = None
+
+    def _idle_flush(self):
+        with self._lock:
+            self._flush()
+
+    def _open(self):
+        filename = self._logdir / self._filename
+        if isinstance(filename, path.LocalPath):
+            # Rows are already batched, so local files skip the io buffering
+            # layer and get a raw descriptor for single write calls.
+            flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+            self._fd = os.open(str(filename), flags, 0o644)
+            self._files.callback(os.close, self._fd)
+        else:
+            self._file = self._files.enter_context(filename.open("ab"))
 
     def _write(self, summaries):
         bystep = collections.defaultdict(dict)
         for step, name, value in summaries:
             if len(value.shape) == 0 and self._pattern.search(name):
                 bystep[step][name] = float(value)
-        lines = "".join(
-            [
-                json.dumps({"step": step, **scalars}) + "\n"
-                for step, scalars in bystep.items()
-            ]
+        for step, scalars in bystep.items():
+            chunk = _dumps_line({"step": step, **scalars})
+            self._chunks.append(chunk)
+            self._pending += len(chunk)
+        if (
+            self._pending >= self._buffer_size
+            or time.monotonic() - self._last_flush >= self._flush_interval
+        ):
+            self._flush()
+
+    def _flush(self):
+        if self._chunks:
+            if self._fd is None and not self._file:
+                self._open()
+            self._unsynced += self._pending
+            if self._fd is not None:
+                self._write_chunks(self._chunks)
+            else:
+                self._file.write(b"".join(self._chunks))
+                self._file.flush()
+            self._chunks.clear()
+            self._pending = 0
+        self._last_flush = time.monotonic()
+        if self._fsync_interval is not None and (
+            self._unsynced >= self._fsync_bytes
+            or self._last_flush - self._last_fsync >= self._fsync_interval
+        ):
+            self._fsync()
+
+    def _write_chunks(self, chunks):
+        # Vectored writes hand all rows to the kernel in one call without
+        # joining them first.
+        if not hasattr(os, "writev"):
+            return self._write_all(b"".join(chunks))
+        for start in range(0, len(chunks), _IOV_MAX):
+            group = chunks[start : start + _IOV_MAX]
+            written = os.writev(self._fd, group)
+            if written < sum(len(chunk) for chunk in group):
+                self._write_all(b"".join(group)[written:])
+
+    def _write_all(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view) :]
+
+    def _fsync(self):
+        # Only local files can be synced, remote ones are durable once closed.
+        if self._fsync_interval is None:
+            return
+        if self._unsynced and self._fd is not None:
+            os.fsync(self._fd)
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+class AsyncJSONLOutput(JSONLOutput):
+    """JSONLOutput that lets up to maxsize writes queue up for its writer.
+
+    The writer thread also flushes buffered rows once it has been idle for
+    flush_interval seconds.
+    """
+
+    def __init__(
+        self,
+        logdir,
+        filename="metrics.jsonl",
+        pattern=r".*",
+        maxsize=200,
+        flush_interval=1.0,
+        fsync_interval=None,
+    ):
+        super().__init__(
+            logdir,
+            filename,
+            pattern,
+            parallel=True,
+            flush_interval=flush_interval,
+            fsync_interval=fsync_interval,
+            maxsize=maxsize,
         )
-        with (self._logdir / self._filename).open("a") as f:
-            f.write(lines)
 
-from torch.utils.tensorboard import SummaryWriter
 
 class TensorBoardOutput(AsyncOutput):
     def __init__(self, logdir, fps=20, maxsize=1e9, parallel=True):
@@ -176,6 +385,8 @@ class TensorBoardOutput(AsyncOutput):
     def _write(self, summaries):
 
         if not self._writer:
+            from torch.utils.tensorboard import SummaryWriter
+
             print("Creating new TensorBoard event file writer.")
             self._writer = SummaryWriter(self._logdir, flush_secs=1, max_queue=10000)
         for step, name, value in summaries:
@@ -207,6 +418,8 @@ class TensorBoardOutput(AsyncOutput):
 
 class WandBOutput:
     def __init__(self, logdir, config):
+        import wandb
+
         name = (
             config["wandb_name"]
             if "wandb_name" in config and config["wandb_name"] is not None
@@ -295,6 +508,18 @@ class WandBOutput:
 #             self._mlflow.start_run(run_name=run_name, tags=tags)
 
 
+# Number of buffers per writev call that is supported on Linux and macOS.
+_IOV_MAX = 1024
+
+
+def _dumps_line(row):
+    # Note that orjson writes NaN and infinity as null, which is matched here.
+    if orjson:
+        return orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+    row = {k: v if math.isfinite(v) else None for k, v in row.items()}
+    return json.dumps(row, separators=(",", ":")).encode() + b"\n"
+
+
 def _encode_gif(frames, fps):
     h, w, c = frames[0].shape
     pxfmt = {1: "gray", 3: "rgb24"}[c]
@@ -28,8 +28,11 @@ class Metrics:
                 self._scalars[key].append(value)
 
     def result(self, reset=True):
-        result = {}
-        result.update(self._lasts)
+        if reset:
+            # Hand over the dict of last values instead of copying it.
+            result, self._lasts = self._lasts, {}
+        else:
+            result = dict(self._lasts)
         with warnings.catch_warnings():  # Ignore empty slice warnings.
             warnings.simplefilter("ignore", category=RuntimeWarning)
             for key, values in self._scalars.items():
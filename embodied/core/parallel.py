@@ -5,25 +5,46 @@ from . import worker
 
 
 class Parallel:
-    def __init__(self, ctor, strategy):
+    # Attributes that are fixed after construction and safe to cache.
+    STATIC = ("obs_space", "act_space")
+
+    def __init__(self, ctor, strategy, shared=False):
         self.worker = worker.Worker(bind(self._respond, ctor), strategy, state=True)
-        self.callables = {}
+        # Probe all public attributes in a single round trip.
+        self.callables, self.static = self.worker(Message.INTROSPECT, None)()
+        self.methods = {}
+        if shared:
+            # Return image-like observations through shared memory.
+            spec = {
+                k: (v.shape, v.dtype)
+                for k, v in self.obs_space.items()
+                if len(v.shape) >= 2
+            }
+            spec and self.worker.share(spec)
 
     def __getattr__(self, name):
         if name.startswith("_"):
             raise AttributeError(name)
+        if name in self.static:
+            return self.static[name]
         if name not in self.callables:
             self.callables[name] = self.worker(Message.CALLABLE, name)()
         if self.callables[name] is Message.ERROR_ATTRIBUTE:
             raise AttributeError(name)
         if self.callables[name]:
-            return bind(self.worker, Message.CALL, name)
+            if name not in self.methods:
+                self.methods[name] = bind(self.worker, Message.CALL, name)
+            return self.methods[name]
         else:
             result = self.worker(Message.READ, name)()
             if result is Message.ERROR_ATTRIBUTE:
                 raise AttributeError(name)
             return result
 
+    def step(self, action):
+        # Hot path: skip the attribute lookup and callable probe.
+        return self.worker(Message.CALL, "step", action)
+
     def __len__(self):
         return self.worker(Message.CALL, "__len__")()
 
@@ -42,13 +63,32 @@ class Parallel:
             elif message == Message.READ:
                 assert not args and not kwargs, (args, kwargs)
                 result = getattr(state, name)
+            elif message == Message.INTROSPECT:
+                result = Parallel._introspect(state)
             return state, result
         except AttributeError:
             return state, Message.ERROR_ATTRIBUTE
 
 
+    @staticmethod
+    def _introspect(state):
+        callables, static = {}, {}
+        for name in dir(state):
+            if name.startswith("_"):
+                continue
+            try:
+                value = getattr(state, name)
+            except Exception:
+                continue  # Probed again on first access.
+            callables[name] = callable(value)
+            if name in Parallel.STATIC:
+                static[name] = value
+        return callables, static
+
+
 class Message(enum.Enum):
     CALLABLE = 2
     CALL = 3
     READ = 4
     ERROR_ATTRIBUTE = 5
+    INTROSPECT = 6
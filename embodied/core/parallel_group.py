@@ -0,0 +1,109 @@
+import enum
+import math
+from functools import partial as bind
+
+import numpy as np
+
+from . import base
+from . import worker
+
+
+class ParallelGroup(base.Env):
+    """Batched env that steps several envs inside each worker process.
+
+    Compared to one Parallel worker per env, this needs a single message per
+    group and step, so there are ceil(num_envs / envs_per_proc) round trips.
+    """
+
+    def __init__(self, ctors, envs_per_proc, strategy="process"):
+        assert len(ctors) > 0 and envs_per_proc > 0
+        self.num_processes = math.ceil(len(ctors) / envs_per_proc)
+        groups = [
+            ctors[i : i + envs_per_proc] for i in range(0, len(ctors), envs_per_proc)
+        ]
+        self._sizes = [len(group) for group in groups]
+        self._workers = [
+            worker.Worker(bind(self._respond, group), strategy, state=True)
+            for group in groups
+        ]
+        self._obs_space, self._act_space = self._workers[0](Message.SPACES)()
+
+    @property
+    def obs_space(self):
+        return self._obs_space
+
+    @property
+    def act_space(self):
+        return self._act_space
+
+    def __len__(self):
+        return sum(self._sizes)
+
+    def step(self, action):
+        assert all(len(v) == len(self) for v in action.values()), (
+            len(self),
+            {k: v.shape for k, v in action.items()},
+        )
+        promises = []
+        start = 0
+        for worker_, size in zip(self._workers, self._sizes):
+            act = {k: v[start : start + size] for k, v in action.items()}
+            promises.append(worker_(Message.STEP, act))
+            start += size
+        obs = self._gather(promises)
+        return {k: np.concatenate([ob[k] for ob in obs]) for k in obs[0]}
+
+    def render(self):
+        promises = [worker_(Message.RENDER) for worker_ in self._workers]
+        return np.concatenate(self._gather(promises))
+
+    def close(self):
+        for worker_ in self._workers:
+            try:
+                worker_(Message.CLOSE)()
+            except Exception:
+                pass
+            worker_.close()
+
+    @staticmethod
+    def _gather(promises):
+        # Receive from every group before raising, so that no responses are
+        # left behind in the pipes.
+        results, error = [], None
+        for promise in promises:
+            try:
+                results.append(promise())
+            except Exception as e:
+                error = error or e
+        if error:
+            raise error
+        return results
+
+    @staticmethod
+    def _respond(ctors, envs, message, *args):
+        envs = envs or [ctor() for ctor in ctors]
+        if message == Message.SPACES:
+            return envs, (envs[0].obs_space, envs[0].act_space)
+        elif message == Message.STEP:
+            (action,) = args
+            obs = []
+            for i, env in enumerate(envs):
+                obs.append(env.step({k: v[i] for k, v in action.items()}))
+            return envs, {k: np.array([ob[k] for ob in obs]) for k in obs[0]}
+        elif message == Message.RENDER:
+            return envs, np.stack([env.render() for env in envs])
+        elif message == Message.CLOSE:
+            for env in envs:
+                try:
+                    env.close()
+                except Exception:
+                    pass
+            return envs, None
+        raise KeyError(f"Invalid message: {message}")
+
+
+class Message(enum.Enum):
+    SPACES = 1
+    STEP = 2
+    RENDER = 3
+    CLOSE = 4
@@ -54,12 +54,14 @@ class Space:
             return False
         return True
 
-    def sample(self):
+    def sample(self, batch=None):
+        # Drawing a batch at once yields the same values as batch single calls.
         low, high = self.low, self.high
         if np.issubdtype(self.dtype, np.floating):
             low = np.maximum(np.ones(self.shape) * np.finfo(self.dtype).min, low)
             high = np.minimum(np.ones(self.shape) * np.finfo(self.dtype).max, high)
-        return self._random.uniform(low, high, self.shape).astype(self.dtype)
+        shape = self.shape if batch is None else (batch, *self.shape)
+        return self._random.uniform(low, high, shape).astype(self.dtype)
 
     def _infer_low(self, dtype, shape, low, high):
         if low is not None:
@@ -8,6 +8,9 @@ import traceback
 import cloudpickle
 from functools import partial as bind
 import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
 
 
 class Worker:
@@ -27,13 +30,19 @@ class Worker:
         self.promise = None
 
     def __call__(self, *args, **kwargs):
-        self.promise and self.promise()  # Raise previous exception if any.
+        promise, self.promise = self.promise, None
+        promise and promise()  # Raise previous exception if any.
         self.promise = self.impl(*args, **kwargs)
         return self.promise
 
     def wait(self):
         return self.impl.wait()
 
+    def share(self, spec):
+        # Only process workers need shared buffers to avoid pickling results.
+        if isinstance(self.impl, ProcessPipeWorker):
+            self.impl.share(spec)
+
     def close(self):
         self.impl.close()
 
@@ -131,6 +140,8 @@ class ProcessPipeWorker:
         self._process.start()
         self._nextid = 0
         self._results = {}
+        self._shared = {}
+        self._buffers = []
         assert self._submit(Message.OK)()
         atexit.register(self.close)
 
@@ -140,12 +151,33 @@ class ProcessPipeWorker:
     def wait(self):
         pass
 
+    def share(self, spec):
+        # Arrays under these keys in dict results are returned through shared
+        # memory instead of the pipe. The spec maps keys to (shape, dtype).
+        names = {}
+        for key, (shape, dtype) in spec.items():
+            dtype = np.dtype(dtype)
+            size = max(1, int(np.prod(shape)) * dtype.itemsize)
+            buffer = shared_memory.SharedMemory(create=True, size=size)
+            self._buffers.append(buffer)
+            self._shared[key] = np.ndarray(shape, dtype, buffer=buffer.buf)
+            names[key] = (buffer.name, shape, dtype.str)
+        assert self._submit(Message.SHARE, names)()
+
     def close(self):
         try:
             self._pipe.send((Message.STOP, self._nextid, None))
             self._pipe.close()
         except (AttributeError, IOError):
             pass  # The connection was already closed.
+        self._shared = {}
+        for buffer in self._buffers:
+            try:
+                buffer.close()
+                buffer.unlink()
+            except Exception:
+                pass
+        self._buffers = []
         try:
             self._process.join(0.1)
             if self._process.exitcode is None:
@@ -172,6 +204,12 @@ class ProcessPipeWorker:
             if message == Message.ERROR:
                 raise Exception(payload)
             assert message == Message.RESULT, message
+            if isinstance(payload, dict) and self._shared:
+                # Copy out before the worker can overwrite the buffers.
+                payload = {
+                    k: self._shared[k].copy() if v is Message.SHARED else v
+                    for k, v in payload.items()
+                }
             self._results[callid] = payload
         return self._results.pop(callid)
 
@@ -180,6 +218,8 @@ class ProcessPipeWorker:
         try:
             callid = None
             state = None
+            shared = {}
+            buffers = []
             initializers = cloudpickle.loads(initializers)
             function = cloudpickle.loads(function)
             [fn() for fn in initializers]
@@ -197,9 +237,18 @@ class ProcessPipeWorker:
                     pipe.send((Message.RESULT, callid, True))
                 elif message == Message.STOP:
                     return
+                elif message == Message.SHARE:
+                    for key, (name, shape, dtype) in payload.items():
+                        # The parent owns the buffer and unlinks it on close.
+                        buffer = shared_memory.SharedMemory(name=name)
+                        buffers.append(buffer)
+                        shared[key] = np.ndarray(shape, dtype, buffer=buffer.buf)
+                    pipe.send((Message.RESULT, callid, True))
                 elif message == Message.RUN:
                     args, kwargs = payload
                     state, result = function(state, *args, **kwargs)
+                    if shared and isinstance(result, dict):
+                        result = ProcessPipeWorker._write_shared(result, shared)
                     pipe.send((Message.RESULT, callid, result))
                 else:
                     raise KeyError(f"Invalid message: {message}")
@@ -221,17 +270,41 @@ class ProcessPipeWorker:
                     return
 
 
+    @staticmethod
+    def _write_shared(result, shared):
+        # Only arrays that match the buffer exactly are shared, anything else
+        # such as spaces goes through the pipe unchanged.
+        result = dict(result)
+        for key, array in shared.items():
+            value = result.get(key)
+            if (
+                isinstance(value, np.ndarray)
+                and value.shape == array.shape
+                and value.dtype == array.dtype
+            ):
+                array[...] = value
+                result[key] = Message.SHARED
+        return result
+
+
 class Future:
     def __init__(self, receive, callid):
         self._receive = receive
         self._callid = callid
         self._result = None
+        self._error = None
         self._complete = False
 
     def __call__(self):
         if not self._complete:
-            self._result = self._receive(self._callid)
+            # Errors are kept since the response cannot be received again.
+            try:
+                self._result = self._receive(self._callid)
+            except Exception as e:
+                self._error = e
             self._complete = True
+        if self._error:
+            raise self._error
         return self._result
 
 
@@ -241,3 +314,5 @@ class Message(enum.Enum):
     RESULT = 3
     STOP = 4
     ERROR = 5
+    SHARE = 6
+    SHARED = 7
@@ -0,0 +1,37 @@
+"""Scalar step helper for PinPadDense."""
+
+WALL = -1
+FLOOR = 0
+
+
+def step_kernel(layout_codes, target_centers, weights, match_len, px, py, dx, dy):
+    """Moves the player and computes the dense guidance reward.
+
+    Layout codes are WALL, FLOOR, or the 1-based index of a pad in the target
+    sequence. Weights hold the move toward, move away, wrong tile, and correct
+    tile reward constants. Returns the new position, the code of the tile that
+    was stepped on, and the dense reward.
+    """
+    width, height = len(layout_codes), len(layout_codes[0])
+    x = px + dx
+    x = 0 if x < 0 else width - 1 if x > width - 1 else x
+    y = py + dy
+    y = 0 if y < 0 else height - 1 if y > height - 1 else y
+    code = layout_codes[x][y]
+    if code == WALL:
+        x, y = px, py
+    reward = 0.0
+    if match_len < len(target_centers):
+        cx, cy = target_centers[match_len][0], target_centers[match_len][1]
+        # Squared distances suffice since only their ordering matters
+        old_d2 = (px - cx) ** 2 + (py - cy) ** 2
+        new_d2 = (x - cx) ** 2 + (y - cy) ** 2
+        if new_d2 < old_d2:
+            reward += weights[0]
+        elif new_d2 > old_d2:
+            reward -= weights[1]
+        if code == match_len + 1:
+            reward += weights[3]
+        elif code > FLOOR:
+            reward -= weights[2]
+    return x, y, code, reward
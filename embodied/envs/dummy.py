@@ -10,10 +10,13 @@ class Dummy(embodied.Env):
         self._length = length
         self._step = 0
         self._done = False
-
-    @property
-    def obs_space(self):
-        return {
+        # Constant observations are allocated once and shared read-only.
+        self._image = np.zeros(self._size + (3,), np.uint8)
+        self._vector = np.zeros(7, np.float32)
+        self._image.flags.writeable = False
+        self._vector.flags.writeable = False
+        # Cache spaces instead of rebuilding them on every access
+        self._obs_space = {
             "image": embodied.Space(np.uint8, self._size + (3,)),
             "vector": embodied.Space(np.float32, (7,)),
             "step": embodied.Space(np.int32, (), 0, self._length),
@@ -22,14 +25,19 @@ class Dummy(embodied.Env):
             "is_last": embodied.Space(bool),
             "is_terminal": embodied.Space(bool),
         }
-
-    @property
-    def act_space(self):
         if self._task == "cont":
             space = embodied.Space(np.float32, (6,))
         else:
             space = embodied.Space(np.int32, (), 0, 5)
-        return {"action": space, "reset": embodied.Space(bool)}
+        self._act_space = {"action": space, "reset": embodied.Space(bool)}
+
+    @property
+    def obs_space(self):
+        return self._obs_space
+
+    @property
+    def act_space(self):
+        return self._act_space
 
     def step(self, action):
         if action["reset"] or self._done:
@@ -43,8 +51,8 @@ class Dummy(embodied.Env):
 
     def _obs(self, reward, is_first=False, is_last=False, is_terminal=False):
         return dict(
-            image=np.zeros(self._size + (3,), np.uint8),
-            vector=np.zeros(7, np.float32),
+            image=self._image,
+            vector=self._vector,
             step=self._step,
             reward=reward,
             is_first=is_first,
@@ -3,6 +3,8 @@ import collections
 import embodied
 import numpy as np
 
+from . import _pinpad_step
+
 
 class PinPadDense(embodied.Env):
     COLORS = {
@@ -16,13 +18,15 @@ class PinPadDense(embodied.Env):
         "8": (0, 128, 128),
     }
 
+    MOVES = ((0, 0), (0, 1), (0, -1), (1, 0), (-1, 0))
+
     # Dense guidance reward constants
     DENSE_MOVE_TOWARD_REWARD = 0.1
     DENSE_MOVE_AWAY_PENALTY = 0.05
     DENSE_WRONG_TILE_PENALTY = 0.1
     DENSE_CORRECT_TILE_BONUS = 1.0
 
-    def __init__(self, task, length=1000, seed=None):
+    def __init__(self, task, length=1000, seed=None, include_image=True):
         assert length > 0
         layout = {
             "three": LAYOUT_THREE,
@@ -34,11 +38,17 @@ class PinPadDense(embodied.Env):
         }[task]
         self.layout = np.array([list(line) for line in layout.split("\n")]).T
         assert self.layout.shape == (16, 14), self.layout.shape
+        # Nested tuples of str for cheap per-step tile lookups
+        self._layout_tuple = tuple(tuple(row) for row in self.layout.tolist())
         self.length = length
+        # Rendering dominates the step cost, so it can be skipped when the
+        # caller only consumes rewards and episode flags.
+        self.include_image = include_image
         self._seed = seed
-        self.random = np.random.RandomState(seed)
-        self.pads = set(self.layout.flatten().tolist()) - set("* #\n")
+        self.random = np.random.default_rng(seed)
+        self.pads = frozenset(self.layout.flatten().tolist()) - set("* #\n")
         self.target = tuple(sorted(self.pads))
+        self._target_len = len(self.target)
         self.spawns = []
         # Precompute pad center positions for distance-based rewards
         self.pad_positions = {}
@@ -49,14 +59,58 @@ class PinPadDense(embodied.Env):
                 if char not in self.pad_positions:
                     self.pad_positions[char] = []
                 self.pad_positions[char].append((x, y))
+        # Compact (N, 2) spawn table sampled by index
+        self._spawns = np.array(self.spawns, dtype=np.int8)
         # Compute center of each pad
         self.pad_centers = {}
         for pad, positions in self.pad_positions.items():
             positions = np.array(positions)
-            self.pad_centers[pad] = (positions[:, 0].mean(), positions[:, 1].mean())
+            self.pad_centers[pad] = (
+                float(positions[:, 0].mean()),
+                float(positions[:, 1].mean()),
+            )
+        self._target_centers = [self.pad_centers[char] for char in self.target]
+        # Integer layout and target tables for the step helper, kept as nested
+        # lists since list indexing is cheaper than array indexing here
+        codes = np.full(self.layout.shape, _pinpad_step.FLOOR, np.int8)
+        codes[self.layout == "#"] = _pinpad_step.WALL
+        for i, char in enumerate(self.target):
+            codes[self.layout == char] = i + 1
+        self._layout_codes = codes.tolist()
+        self._dense_weights = (
+            self.DENSE_MOVE_TOWARD_REWARD,
+            self.DENSE_MOVE_AWAY_PENALTY,
+            self.DENSE_WRONG_TILE_PENALTY,
+            self.DENSE_CORRECT_TILE_BONUS,
+        )
+        # Precompute static render backgrounds (walls, dimmed pads, sidebar)
+        white = np.array([255, 255, 255])
+        self._pad_masks = {}
+        self._bright_colors = {}
+        self._base_grid_normal = np.full((16, 16, 3), 255, np.uint8)
+        self._base_grid_countdown = np.zeros((16, 16, 3), np.uint8)
+        self._base_grid_countdown[:] = (223, 255, 223)
+        for grid in (self._base_grid_normal, self._base_grid_countdown):
+            grid[:, :14][self.layout == "#"] = (192, 192, 192)
+            grid[:, -2:] = (192, 192, 192)
+        for char in self.pads:
+            color = np.array(self.COLORS[char])
+            mask = np.zeros((16, 16), bool)
+            mask[:, :14] = self.layout == char
+            self._pad_masks[char] = mask
+            self._bright_colors[char] = color.astype(np.uint8)
+            dim = ((10 * color + 90 * white) / 100).astype(np.uint8)
+            self._base_grid_normal[mask] = dim
+            self._base_grid_countdown[mask] = dim
+        self._grid = np.zeros((16, 16, 3), np.uint8)
         
         print(f'Created PinPadDense env with sequence: {"->".join(self.target)}')
-        self.sequence = collections.deque(maxlen=len(self.target))
+        # Recent pads, only kept for drawing the sidebar in render
+        self.sequence = collections.deque(maxlen=self._target_len)
+        # Last visited pad and the length of the longest suffix of visited
+        # pads that matches a target prefix
+        self._last_tile = None
+        self._match_len = 0
         self.player = None
         self.steps = None
         self.done = None
@@ -75,6 +129,8 @@ class PinPadDense(embodied.Env):
             "is_last": embodied.Space(bool, seed=seed),
             "is_terminal": embodied.Space(bool, seed=seed),
         }
+        if not include_image:
+            del self._obs_space["image"]
 
     @property
     def act_space(self):
@@ -86,8 +142,10 @@ class PinPadDense(embodied.Env):
 
     def step(self, action):
         if self.done or action["reset"]:
-            self.player = self.spawns[self.random.randint(len(self.spawns))]
+            self.player = self._random_spawn()
             self.sequence.clear()
+            self._last_tile = None
+            self._match_len = 0
             self.steps = 0
             self.done = False
             self.countdown = 0
@@ -95,95 +153,83 @@ class PinPadDense(embodied.Env):
         if self.countdown:
             self.countdown -= 1
             if self.countdown == 0:
-                self.player = self.spawns[self.random.randint(len(self.spawns))]
+                self.player = self._random_spawn()
                 self.sequence.clear()
+                self._last_tile = None
+                self._match_len = 0
         
-        reward = 0.0
-        old_pos = self.player
-        move = [(0, 0), (0, 1), (0, -1), (1, 0), (-1, 0)][action["action"]]
-        x = np.clip(self.player[0] + move[0], 0, 15)
-        y = np.clip(self.player[1] + move[1], 0, 13)
-        tile = self.layout[x][y]
-        
-        if tile != "#":
+        # Movement and dense guidance reward
+        dx, dy = self.MOVES[action["action"]]
+        x, y, code, reward = _pinpad_step.step_kernel(
+            self._layout_codes,
+            self._target_centers,
+            self._dense_weights,
+            self._match_len,
+            self.player[0],
+            self.player[1],
+            dx,
+            dy,
+        )
+        if code != _pinpad_step.WALL:
             self.player = (x, y)
             # Track position visits
             self.position_visit_counts[x, y] += 1
+        tile = self.target[code - 1] if code > _pinpad_step.FLOOR else None
+
+        if tile is not None and tile != self._last_tile:
+            self._last_tile = tile
+            self.sequence.append(tile)
+            self._update_match(tile)
         
-        # Dense guidance: compute distance-based rewards
-        reward += self._compute_dense_guidance_reward(old_pos, self.player, tile)
-        
-        if tile in self.pads:
-            if not self.sequence or self.sequence[-1] != tile:
-                self.sequence.append(tile)
-        
-        if tuple(self.sequence) == self.target and not self.countdown:
+        if self._match_len == self._target_len and not self.countdown:
             reward += 10.0
             self.countdown = 10
         self.steps += 1
         self.done = self.done or (self.steps >= self.length)
         return self._obs(reward=reward, is_last=self.done)
 
-    def _compute_longest_suffix_match(self):
-        if not self.sequence:
-            return 0
-        buffer_list = list(self.sequence)
-        target_list = list(self.target)
-        for suffix_start in range(len(buffer_list)):
-            suffix = buffer_list[suffix_start:]
-            if len(suffix) <= len(target_list):
-                if suffix == target_list[:len(suffix)]:
-                    return len(suffix)
-        return 0
+    def _random_spawn(self):
+        idx = self.random.integers(len(self._spawns))
+        return (int(self._spawns[idx, 0]), int(self._spawns[idx, 1]))
+
+    def _update_match(self, tile):
+        match_len = self._match_len
+        if match_len < self._target_len and tile == self.target[match_len]:
+            self._match_len = match_len + 1
+        else:
+            # Pads in the target are distinct, so after a mismatch the only
+            # suffix that can still match is the new tile on its own.
+            self._match_len = 1 if tile == self.target[0] else 0
 
-    def _compute_dense_guidance_reward(self, old_pos, new_pos, tile):
-        current_score = self._compute_longest_suffix_match()
-        next_target_idx = current_score
-        if next_target_idx >= len(self.target):
-            return 0.0
-        next_target = self.target[next_target_idx]
-        target_center = self.pad_centers[next_target]
-        old_dist = np.sqrt((old_pos[0] - target_center[0])**2 + (old_pos[1] - target_center[1])**2)
-        new_dist = np.sqrt((new_pos[0] - target_center[0])**2 + (new_pos[1] - target_center[1])**2)
-        reward = 0.0
-        if new_dist < old_dist:
-            reward += self.DENSE_MOVE_TOWARD_REWARD
-        elif new_dist > old_dist:
-            reward -= self.DENSE_MOVE_AWAY_PENALTY
-        if tile in self.pads and tile != next_target:
-            reward -= self.DENSE_WRONG_TILE_PENALTY
-        if tile == next_target:
-            reward += self.DENSE_CORRECT_TILE_BONUS
-        return reward
+    def _compute_longest_suffix_match(self):
+        return self._match_len
 
     def render(self):
-        grid = np.zeros((16, 16, 3), np.uint8) + 255
-        white = np.array([255, 255, 255])
+        grid = self._grid
         if self.countdown:
-            grid[:] = (223, 255, 223)
-        current = self.layout[self.player[0]][self.player[1]]
-        for (x, y), char in np.ndenumerate(self.layout):
-            if char == "#":
-                grid[x, y] = (192, 192, 192)
-            elif char in self.pads:
-                color = np.array(self.COLORS[char])
-                color = color if char == current else (10 * color + 90 * white) / 100
-                grid[x, y] = color
+            np.copyto(grid, self._base_grid_countdown)
+        else:
+            np.copyto(grid, self._base_grid_normal)
+        current = self._layout_tuple[self.player[0]][self.player[1]]
+        if current in self.pads:
+            grid[self._pad_masks[current]] = self._bright_colors[current]
         grid[self.player] = (0, 0, 0)
-        grid[:, -2:] = (192, 192, 192)
         for i, char in enumerate(self.sequence):
             grid[2 * i + 1, -2] = self.COLORS[char]
-        image = np.repeat(np.repeat(grid, 4, 0), 4, 1)
-        return image.transpose((1, 0, 2))
+        # Transpose and upsample 4x in a single contiguous copy
+        image = grid.transpose((1, 0, 2))[:, None, :, None]
+        return np.broadcast_to(image, (16, 4, 16, 4, 3)).reshape((64, 64, 3))
 
     def _obs(self, reward, is_first=False, is_last=False, is_terminal=False):
-        return dict(
-            image=self.render(),
+        obs = dict(
             reward=reward,
             is_first=is_first,
             is_last=is_last,
             is_terminal=is_terminal,
         )
+        if self.include_image:
+            obs["image"] = self.render()
+        return obs
 
     def get_position_heatmap(self):
         visit_counts = self.position_visit_counts.copy().astype(np.float32)
@@ -192,37 +238,24 @@ class PinPadDense(embodied.Env):
             normalized_counts = visit_counts / max_visits
         else:
             normalized_counts = visit_counts
-        heatmap = np.zeros((16, 14, 3), dtype=np.uint8)
-        for (x, y), count in np.ndenumerate(normalized_counts):
-            char = self.layout[x, y]
-            if char == "#":
-                heatmap[x, y] = (192, 192, 192)
-            else:
-                intensity = normalized_counts[x, y]
-                if intensity < 0.25:
-                    r = 0
-                    g = int(intensity * 4 * 255)
-                    b = 255
-                elif intensity < 0.5:
-                    r = 0
-                    g = 255
-                    b = int((0.5 - intensity) * 4 * 255)
-                elif intensity < 0.75:
-                    r = int((intensity - 0.5) * 4 * 255)
-                    g = 255
-                    b = 0
-                else:
-                    r = 255
-                    g = int((1.0 - intensity) * 4 * 255)
-                    b = 0
-                heatmap[x, y] = (r, g, b)
+        # Blue (low) -> Cyan -> Green -> Yellow -> Red (high)
+        intensity = normalized_counts
+        low = intensity < 0.25
+        mid_low = ~low & (intensity < 0.5)
+        mid_high = ~low & ~mid_low & (intensity < 0.75)
+        high = ~(low | mid_low | mid_high)
+        r = np.where(mid_high, (intensity - 0.5) * 4 * 255, 0) + np.where(high, 255, 0)
+        g = np.where(low, intensity * 4 * 255, 0) + np.where(mid_low | mid_high, 255, 0)
+        g = g + np.where(high, (1.0 - intensity) * 4 * 255, 0)
+        b = np.where(low, 255, 0) + np.where(mid_low, (0.5 - intensity) * 4 * 255, 0)
+        heatmap = np.stack([r, g, b], axis=-1)
+        heatmap = np.clip(heatmap, 0, 255).astype(np.uint8)
+        heatmap[self.layout == "#"] = (192, 192, 192)
         heatmap_scaled = np.repeat(np.repeat(heatmap, 4, 0), 4, 1)
         return heatmap_scaled.transpose((1, 0, 2))
 
     def get_position_stats(self):
-        valid_positions = np.zeros_like(self.position_visit_counts, dtype=bool)
-        for (x, y), char in np.ndenumerate(self.layout):
-            valid_positions[x, y] = (char != "#")
+        valid_positions = self.layout != "#"
         valid_visits = self.position_visit_counts[valid_positions]
         total_valid_positions = valid_positions.sum()
         visited_positions = (valid_visits > 0).sum()
@@ -70,6 +70,17 @@ class PinPadEasy(embodied.Env):
         for pad, positions in self.pad_positions.items():
             positions = np.array(positions)
             self.pad_centers[pad] = (positions[:, 0].mean(), positions[:, 1].mean())
+        # Precompute render masks and pad colors
+        white = np.array([255, 255, 255])
+        self._walls_mask = self.layout == "#"
+        self._pad_masks = {}
+        self._bright = {}
+        self._dim = {}
+        for char in self.pads:
+            color = np.array(self.COLORS[char])
+            self._pad_masks[char] = self.layout == char
+            self._bright[char] = color.astype(np.uint8)
+            self._dim[char] = ((10 * color + 90 * white) / 100).astype(np.uint8)
         self.reward_mode = reward_mode
         print(f'Created PinPadEasy env with sequence: {"->".join(self.target)}, reward_mode: {reward_mode}')
         self.sequence = collections.deque(maxlen=len(self.target))
@@ -301,17 +312,13 @@ class PinPadEasy(embodied.Env):
 
     def render(self):
         grid = np.zeros((16, 16, 3), np.uint8) + 255
-        white = np.array([255, 255, 255])
         if self.countdown:
             grid[:] = (223, 255, 223)
         current = self.layout[self.player[0]][self.player[1]]
-        for (x, y), char in np.ndenumerate(self.layout):
-            if char == "#":
-                grid[x, y] = (192, 192, 192)
-            elif char in self.pads:
-                color = np.array(self.COLORS[char])
-                color = color if char == current else (10 * color + 90 * white) / 100
-                grid[x, y] = color
+        cells = grid[:, :14]
+        cells[self._walls_mask] = (192, 192, 192)
+        for char, mask in self._pad_masks.items():
+            cells[mask] = self._bright[char] if char == current else self._dim[char]
         grid[self.player] = (0, 0, 0)
         grid[:, -2:] = (192, 192, 192)
         for i, char in enumerate(self.sequence):
@@ -345,38 +352,21 @@ class PinPadEasy(embodied.Env):
         
         # Create RGB heatmap (red = high visits, blue = low visits)
         # Use a color gradient from blue (cold/low) to red (hot/high)
-        heatmap = np.zeros((16, 14, 3), dtype=np.uint8)
-        
-        for (x, y), count in np.ndenumerate(normalized_counts):
-            char = self.layout[x, y]
-            if char == "#":
-                # Walls are gray
-                heatmap[x, y] = (192, 192, 192)
-            else:
-                # Color based on visit frequency
-                # Blue (low) -> Green -> Yellow -> Red (high)
-                intensity = normalized_counts[x, y]
-                if intensity < 0.25:
-                    # Blue to Cyan
-                    r = 0
-                    g = int(intensity * 4 * 255)
-                    b = 255
-                elif intensity < 0.5:
-                    # Cyan to Green
-                    r = 0
-                    g = 255
-                    b = int((0.5 - intensity) * 4 * 255)
-                elif intensity < 0.75:
-                    # Green to Yellow
-                    r = int((intensity - 0.5) * 4 * 255)
-                    g = 255
-                    b = 0
-                else:
-                    # Yellow to Red
-                    r = 255
-                    g = int((1.0 - intensity) * 4 * 255)
-                    b = 0
-                heatmap[x, y] = (r, g, b)
+        # Blue (low) -> Cyan -> Green -> Yellow -> Red (high), computed for
+        # all cells at once with one mask per segment of the color ramp
+        intensity = normalized_counts
+        low = intensity < 0.25
+        mid_low = ~low & (intensity < 0.5)
+        mid_high = ~low & ~mid_low & (intensity < 0.75)
+        high = ~(low | mid_low | mid_high)
+        r = np.where(mid_high, (intensity - 0.5) * 4 * 255, 0) + np.where(high, 255, 0)
+        g = np.where(low, intensity * 4 * 255, 0) + np.where(mid_low | mid_high, 255, 0)
+        g = g + np.where(high, (1.0 - intensity) * 4 * 255, 0)
+        b = np.where(low, 255, 0) + np.where(mid_low, (0.5 - intensity) * 4 * 255, 0)
+        heatmap = np.stack([r, g, b], axis=-1)
+        heatmap = np.clip(heatmap, 0, 255).astype(np.uint8)
+        # Walls are gray
+        heatmap[self.layout == "#"] = (192, 192, 192)
         
         # Scale up the heatmap for better visibility (4x)
         heatmap_scaled = np.repeat(np.repeat(heatmap, 4, 0), 4, 1)
@@ -389,9 +379,7 @@ class PinPadEasy(embodied.Env):
         Returns a dictionary with visit statistics.
         """
         # Count only non-wall positions
-        valid_positions = np.zeros_like(self.position_visit_counts, dtype=bool)
-        for (x, y), char in np.ndenumerate(self.layout):
-            valid_positions[x, y] = (char != "#")
+        valid_positions = self.layout != "#"
         
         valid_visits = self.position_visit_counts[valid_positions]
         total_valid_positions = valid_positions.sum()
@@ -33,7 +33,9 @@ class HierarchicalReplay:
         self.table = {}
         self.online = online
         if self.online:
-            self.online_queue = deque()
+            # Bounded like the table, so once full the oldest unsampled
+            # sequences are dropped.
+            self.online_queue = deque(maxlen=int(capacity) if capacity else None)
             self.online_stride = length
             self.online_counters = defaultdict(int)
         self.saver = directory and saver.Saver(directory, chunks)
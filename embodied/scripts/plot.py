@@ -16,6 +16,11 @@ import pandas as pd
 import rich.console
 import tqdm
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 TITLES = {
     "dmlab_explore_goal_locations_small": "DMLab Goals Small",
     "crafter_reward": "Crafter",
@@ -413,6 +418,15 @@ def load_metrics(
     return runs
 
 
+def _loads(line):
+    if orjson:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            pass  # Older logs can contain NaN, which only json accepts.
+    return json.loads(line)
+
+
 def load_run(run, xaxis, yaxis, yaxis2):
     try:
         console = rich.console.Console()
@@ -421,11 +435,11 @@ def load_run(run, xaxis, yaxis, yaxis2):
             df = pd.read_json(filename, lines=True)
         except ValueError:
             records = []
-            for i, line in enumerate(pathlib.Path(filename).read_text().split("\n")):
+            for i, line in enumerate(pathlib.Path(filename).read_bytes().splitlines()):
                 if not line:
                     continue
                 try:
-                    records.append(json.loads(line))
+                    records.append(_loads(line))
                 except ValueError:
                     print(f"Skipping invalid JSON line {i} in {filename}.")
             df = pd.DataFrame(records)
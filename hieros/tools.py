@@ -179,7 +179,7 @@ def simulate(agent, envs, steps=0, episodes=0, state=None, replay=None, config=N
         length = np.zeros(len(envs), np.int32)
         obs = envs.step(
             {
-                "action": [envs.act_space["action"].sample() for _ in range(len(envs))],
+                "action": envs.act_space["action"].sample(len(envs)),
                 "reset": np.ones(len(envs), bool),
             }
         )
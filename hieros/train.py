@@ -39,8 +39,8 @@ def make_logger(logdir, step, config):
     multiplier = config.action_repeat
     outputs = [
         embodied.logger.TerminalOutput(config.filter),
-        embodied.logger.JSONLOutput(logdir, "metrics.jsonl"),
-        embodied.logger.JSONLOutput(logdir, "scores.jsonl", "episode/score"),
+        embodied.logger.AsyncJSONLOutput(logdir, "metrics.jsonl"),
+        embodied.logger.AsyncJSONLOutput(logdir, "scores.jsonl", "episode/score"),
         # embodied.logger.MLFlowOutput(logdir.name),
     ]
     if config.tensorboard_logging:
@@ -221,6 +221,7 @@ def main(config):
             logger.write()
         else:
             raise NotImplementedError
+    logger.close()
 
     for env in [train_envs]:
         try:
@@ -237,12 +238,32 @@ def expand(value, dims):
 
 def make_envs(config, **overrides):
     suite, task = config.task.split("_", 1)
+    per_proc = config.envs["per_proc"]
+    if per_proc > 1 and config.envs["parallel"] != "none":
+        # Step several envs per worker process to cut down on IPC. The restart
+        # wrapper is applied inside the worker around each env.
+        ctors = []
+        for index in range(config.envs["amount"]):
+            ctor = lambda idx=index: make_env(config, env_index=idx, **overrides)
+            if config.envs["restart"]:
+                ctor = functools.partial(wrappers.RestartOnException, ctor)
+            ctors.append(ctor)
+        print(
+            "Envs are grouped per process, position heatmap and coverage "
+            "logging is not available."
+        )
+        return embodied.ParallelGroup(ctors, per_proc, config.envs["parallel"])
     ctors = []
     for index in range(config.envs["amount"]):
         # Create a closure that captures the index to provide unique seeds
         ctor = lambda idx=index: make_env(config, env_index=idx, **overrides)
         if config.envs["parallel"] != "none":
-            ctor = functools.partial(embodied.Parallel, ctor, config.envs["parallel"])
+            ctor = functools.partial(
+                embodied.Parallel,
+                ctor,
+                config.envs["parallel"],
+                shared=config.envs["shared"],
+            )
         if config.envs["restart"]:
             ctor = functools.partial(wrappers.RestartOnException, ctor)
         ctors.append(ctor)
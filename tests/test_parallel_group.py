@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Smoke test for ParallelGroup.
+
+Steps and resets five Dummy envs split into groups of two, so that the last
+group is smaller than the others, and compares the batched observations
+against the individual envs.
+
+Usage:
+    Run from the repository root:
+    python tests/test_parallel_group.py
+"""
+
+import functools
+import sys
+import pathlib
+
+# Add repository root to path
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+import numpy as np
+import embodied
+from embodied.core import wrappers
+from embodied.envs.dummy import Dummy
+
+NUM_ENVS = 5
+ENVS_PER_PROC = 2
+LENGTH = 3
+
+
+def make_group(strategy, restart=False):
+    ctors = [
+        functools.partial(Dummy, "disc", size=(8, 8), length=LENGTH)
+        for _ in range(NUM_ENVS)
+    ]
+    if restart:
+        ctors = [functools.partial(wrappers.RestartOnException, c) for c in ctors]
+    return embodied.ParallelGroup(ctors, ENVS_PER_PROC, strategy)
+
+
+def run_episode(envs):
+    reset = np.ones(NUM_ENVS, bool)
+    action = {"action": np.zeros(NUM_ENVS, np.int32), "reset": reset}
+    obs = envs.step(action)
+    assert obs["is_first"].all(), obs["is_first"]
+    assert obs["image"].shape == (NUM_ENVS, 8, 8, 3), obs["image"].shape
+    action["reset"] = np.zeros(NUM_ENVS, bool)
+    for step in range(1, LENGTH + 1):
+        obs = envs.step(action)
+        assert (obs["step"] == step).all(), obs["step"]
+        assert not obs["is_first"].any()
+    assert obs["is_last"].all(), obs["is_last"]
+    # Stepping past the end resets every env, including the last group.
+    obs = envs.step(action)
+    assert obs["is_first"].all(), obs["is_first"]
+    assert (obs["step"] == 0).all(), obs["step"]
+
+
+def test_blocking():
+    envs = make_group("blocking")
+    try:
+        assert envs.num_processes == 3, envs.num_processes
+        assert len(envs) == NUM_ENVS
+        assert set(envs.act_space) == {"action", "reset"}
+        run_episode(envs)
+    finally:
+        envs.close()
+
+
+def test_process():
+    envs = make_group("process", restart=True)
+    try:
+        assert envs.num_processes == 3, envs.num_processes
+        run_episode(envs)
+        run_episode(envs)
+    finally:
+        envs.close()
+
+
+def main():
+    for test in (test_blocking, test_process):
+        test()
+        print(f"PASSED: {test.__name__}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Smoke test for shared memory observations of process workers.
+
+Steps PinPadDense inside Parallel process workers with and without shared
+memory and compares the images, checks that attribute reads still go through
+the pipe, and that closing unlinks the shared memory segments.
+
+Usage:
+    Run from the repository root:
+    python tests/test_parallel_shared.py
+"""
+
+import functools
+import importlib
+import sys
+import pathlib
+from multiprocessing import shared_memory
+
+# Add repository root to path
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+import numpy as np
+import embodied
+from embodied.core.parallel import Message
+
+PinPadDense = importlib.import_module("embodied.envs.pinpad-dense").PinPadDense
+
+NUM_STEPS = 20
+
+
+def make_env(shared):
+    ctor = functools.partial(PinPadDense, "three", length=NUM_STEPS, seed=0)
+    return embodied.Parallel(ctor, "process", shared=shared)
+
+
+def test_images_match():
+    plain, shared = make_env(False), make_env(True)
+    try:
+        rng = np.random.default_rng(0)
+        for index in range(NUM_STEPS):
+            action = {"action": int(rng.integers(0, 5)), "reset": index == 0}
+            a, b = plain.step(action)(), shared.step(action)()
+            assert a.keys() == b.keys(), (a.keys(), b.keys())
+            assert b["image"].dtype == np.uint8, b["image"].dtype
+            assert (a["image"] == b["image"]).all(), index
+            assert a["reward"] == b["reward"], index
+            # The image was returned through the buffer, not the pipe.
+            assert (shared.worker.impl._shared["image"] == b["image"]).all()
+    finally:
+        plain.close()
+        shared.close()
+
+
+def test_attribute_reads():
+    env = make_env(True)
+    try:
+        assert env.obs_space["image"].shape == (64, 64, 3)
+        assert set(env.act_space) == {"action", "reset"}
+        # Reading a dict with an image key through the pipe must not touch
+        # the shared buffers.
+        obs_space = env.worker(Message.READ, "obs_space")()
+        assert isinstance(obs_space["image"], embodied.Space), obs_space
+        assert env.target == ("1", "2", "3"), env.target
+    finally:
+        env.close()
+
+
+def test_close_unlinks():
+    env = make_env(True)
+    names = [buffer.name for buffer in env.worker.impl._buffers]
+    assert names, "No shared memory segments were created."
+    env.step({"action": 0, "reset": True})()
+    env.close()
+    for name in names:
+        try:
+            segment = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            continue
+        segment.close()
+        raise AssertionError(f"Shared memory {name} was not unlinked.")
+
+
+def main():
+    for test in (test_images_match, test_attribute_reads, test_close_unlinks):
+        test()
+        print(f"PASSED: {test.__name__}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())